@@ -0,0 +1,64 @@
+# Shared helpers for writing analyzer reports
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Reports are machine-consumed; set FORENSIGHT_PRETTY_JSON=1 to indent them
+PRETTY_JSON = os.environ.get("FORENSIGHT_PRETTY_JSON") == "1"
+
+
+def dump_json_bytes(obj, pretty=None) -> bytes:
+    """JSON as UTF-8 bytes: orjson when installed, stdlib otherwise."""
+    if pretty is None:
+        pretty = PRETTY_JSON
+    if orjson:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:
+            # orjson rejects non-str keys and ints beyond 64 bits
+            pass
+    if pretty:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+# Report directories already created by this process
+_ready_dirs = set()
+
+
+def ensure_report_dir(path):
+    """Creates path on first use (not at import) and returns it."""
+    if path not in _ready_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ready_dirs.add(path)
+    return path
+
+
+@contextmanager
+def atomic_open(path, mode="wb", **kwargs):
+    """
+    Writes to a temp file next to path and renames it into place on
+    success, so concurrent writers of the same report never interleave
+    and readers only ever see a complete file.
+    """
+    directory, name = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    # Created like open() would (0o666 minus umask), unlike mkstemp's 0o600
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL
+                 | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,18 @@
+# Shared URL helpers for the URL and browser history analyzers
+from urllib.parse import urlparse
+
+# urlparse (bpo-43882) and browsers drop these anywhere in a URL
+_URL_UNSAFE_CHARS = {9: None, 10: None, 13: None}
+
+
+def extract_netloc(url):
+    """urlparse(url).netloc, without the full parse for plain scheme:// URLs."""
+    url = url.translate(_URL_UNSAFE_CHARS)
+    scheme, sep, rest = url.partition("://")
+    if sep and scheme.isascii() and scheme.isalnum() and scheme[0].isalpha():
+        netloc = rest.partition("/")[0].partition("?")[0].partition("#")[0]
+        # Brackets (IPv6 literals) and non-ASCII hosts are validated by
+        # urlparse, which may reject them with ValueError
+        if netloc.isascii() and "[" not in netloc and "]" not in netloc:
+            return netloc
+    return urlparse(url).netloc
@@ -1,12 +1,21 @@
 
 import os
 import sqlite3
-import shutil
 import json
 import csv
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
-from urllib.parse import urlparse
+from operator import itemgetter
+from pathlib import Path
+
+# Works both as part of the Core package and when run as a script
+try:
+    from ._report_io import atomic_open, ensure_report_dir
+    from ._urls import extract_netloc
+except ImportError:
+    from _report_io import atomic_open, ensure_report_dir
+    from _urls import extract_netloc
 
 # ENVIRONMENT PATHS (Windows)
 
@@ -38,8 +47,7 @@ TOR_PLACES = os.path.join(
 
 # OUTPUT
 
-OUT_DIR = os.path.join(os.getcwd(), "browser_reports")
-os.makedirs(OUT_DIR, exist_ok=True)
+OUT_DIR = os.path.join(os.getcwd(), "browser_reports")  # created on first report
 
 # FORENSIC RULESETS
 
@@ -67,40 +75,50 @@ def firefox_time_to_dt(value):
     except Exception:
         return None
 
+# Sort keys: both browsers' raw values as Unix microseconds
+CHROME_EPOCH_OFFSET_US = 11_644_473_600 * 1_000_000
+NO_TIMESTAMP = -(1 << 63)
+
 # URL ANALYSIS
 
+# analyze_url runs once per history row, so its lookups are prepared here
+_TLDS = frozenset(t.lstrip(".") for t in SUSPICIOUS_TLDS)
+_DIGIT_RE = re.compile(r"\d{3,}")
+_KW_RE = re.compile("|".join(map(re.escape, PHISHING_KEYWORDS)))
+
+
 def extract_domain(url):
     try:
-        netloc = urlparse(url).netloc.lower()
+        netloc = extract_netloc(url).lower()
         return netloc[4:] if netloc.startswith("www.") else netloc
     except Exception:
         return ""
 
 
-def analyze_url(url):
+def analyze_url(url, domain=None):
     flags = []
-    domain = extract_domain(url)
+    if domain is None:
+        domain = extract_domain(url)
     if not domain:
         return flags
 
     if domain in SHORTENED_DOMAINS:
         flags.append("shortened_url")
 
-    for tld in SUSPICIOUS_TLDS:
-        if domain.endswith(tld):
-            flags.append(f"suspicious_tld:{tld}")
+    # Single-label hosts (http://top/) have no TLD to match
+    _, dot, tld = domain.rpartition(".")
+    if dot and tld in _TLDS:
+        flags.append(f"suspicious_tld:.{tld}")
 
-    if re.search(r"\d{3,}", domain):
+    if _DIGIT_RE.search(domain):
         flags.append("numeric_domain")
 
     if domain.count("-") >= 2:
         flags.append("hyphenated_domain")
 
-    lower_url = url.lower()
-    for kw in PHISHING_KEYWORDS:
-        if kw in lower_url:
-            flags.append(f"phishing_keyword:{kw}")
-            break
+    kw = _KW_RE.search(url.lower())
+    if kw:
+        flags.append(f"phishing_keyword:{kw.group()}")
 
     for brand in POPULAR_BRANDS:
       if brand in domain:
@@ -113,93 +131,84 @@ def analyze_url(url):
 
     return list(dict.fromkeys(flags))
 
-# SAFE DATABASE COPYING
+# READ-ONLY DATABASE ACCESS
 
-def safe_copy_db(src):
-    if not os.path.exists(src):
+def open_readonly_db(path):
+    """
+    Opens a browser DB in place instead of copying it: mode=ro never
+    writes, immutable=1 skips locking so a running browser cannot block
+    us. Rows still only in an uncheckpointed -wal file are not seen.
+    """
+    if not os.path.exists(path):
         return None
-    dst = os.path.join(
-        OUT_DIR,
-        f"copy_{os.path.basename(src)}_{int(datetime.now().timestamp())}"
-    )
+    uri = Path(os.path.abspath(path)).as_uri() + "?mode=ro&immutable=1"
     try:
-        shutil.copy2(src, dst)
-        return dst
-    except Exception:
+        return sqlite3.connect(uri, uri=True)
+    except sqlite3.Error:
         return None
 
 # PARSERS
 
 def parse_chromium_history(db_path, browser_name):
-    results = []
-    copy = safe_copy_db(db_path)
-    if not copy:
-        return results
+    conn = open_readonly_db(db_path)
+    if not conn:
+        return
 
     try:
-        conn = sqlite3.connect(copy)
         cur = conn.cursor()
         cur.execute("""
             SELECT url, title, visit_count, last_visit_time
             FROM urls
         """)
-        for url, title, count, last_visit in cur.fetchall():
+        # Iterate the cursor so SQLite streams rows instead of fetchall()
+        for url, title, count, last_visit in cur:
             dt = chrome_time_to_dt(last_visit)
-            results.append({
+            domain = extract_domain(url)
+            yield {
                 "browser": browser_name,
                 "url": url,
                 "title": title,
-                "domain": extract_domain(url),
+                "domain": domain,
                 "visit_count": count,
                 "last_visit": dt.isoformat() if dt else None,
-                "flags": analyze_url(url)
-            })
-        conn.close()
+                "flags": analyze_url(url, domain),
+                "_sort_ts": int(last_visit) - CHROME_EPOCH_OFFSET_US if dt else NO_TIMESTAMP
+            }
     except Exception:
         pass
     finally:
-        try:
-            os.remove(copy)
-        except Exception:
-            pass
-
-    return results
+        conn.close()
 
 
 def parse_firefox_history(db_path):
-    results = []
-    copy = safe_copy_db(db_path)
-    if not copy:
-        return results
+    conn = open_readonly_db(db_path)
+    if not conn:
+        return
 
     try:
-        conn = sqlite3.connect(copy)
         cur = conn.cursor()
         cur.execute("""
             SELECT url, title, visit_count, last_visit_date
             FROM moz_places
         """)
-        for url, title, count, last_visit in cur.fetchall():
+        # Iterate the cursor so SQLite streams rows instead of fetchall()
+        for url, title, count, last_visit in cur:
             dt = firefox_time_to_dt(last_visit)
-            results.append({
+            domain = extract_domain(url)
+            yield {
                 "browser": "Firefox/Tor",
                 "url": url,
                 "title": title,
-                "domain": extract_domain(url),
+                "domain": domain,
                 "visit_count": count,
                 "last_visit": dt.isoformat() if dt else None,
-                "flags": analyze_url(url)
-            })
-        conn.close()
+                "flags": analyze_url(url, domain),
+                "_sort_ts": int(last_visit) if dt else NO_TIMESTAMP
+            }
     except Exception:
         pass
     finally:
-        try:
-            os.remove(copy)
-        except Exception:
-            pass
-
-    return results
+        conn.close()
 
 # DISCOVERY
 
@@ -221,56 +230,68 @@ def find_firefox_dbs():
 
 # TIMELINE BUILDER
 
-def build_timeline():
-    timeline = []
+def collect_history(max_workers=8):
+    """
+    Parses every discovered history DB concurrently. Each job is mostly
+    SQLite I/O, which releases the GIL.
+    """
+    records = []
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        # The generators run (and open their connections) on the worker thread
+        futures = [
+            ex.submit(list, parse_chromium_history(path, name))
+            for name, path in find_chromium_dbs().items()
+        ] + [
+            ex.submit(list, parse_firefox_history(path))
+            for path in find_firefox_dbs()
+        ]
+        for future in as_completed(futures):
+            records.extend(future.result())
+    return records
 
-    for name, path in find_chromium_dbs().items():
-        timeline.extend(parse_chromium_history(path, name))
 
-    for path in find_firefox_dbs():
-        timeline.extend(parse_firefox_history(path))
+def build_timeline():
+    timeline = collect_history()
 
-    def sort_key(x):
-        try:
-            return datetime.fromisoformat(x["last_visit"])
-        except Exception:
-            return datetime.min.replace(tzinfo=timezone.utc)
+    # Integer keys captured at parse time; no per-row isoformat parsing
+    timeline.sort(key=itemgetter("_sort_ts"), reverse=True)
+    for row in timeline:
+        del row["_sort_ts"]
 
-    return sorted(timeline, key=sort_key, reverse=True)
+    return timeline
 
 # REPORTING
 
 def save_reports(timeline):
+    ensure_report_dir(OUT_DIR)
+
     json_path = os.path.join(OUT_DIR, "browser_timeline.json")
     csv_path  = os.path.join(OUT_DIR, "browser_timeline.csv")
 
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(timeline, f, indent=2, ensure_ascii=False)
-
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
+    # One pass over any iterable of records, written to both files as it
+    # goes; atomic_open keeps concurrent scans from interleaving output
+    with atomic_open(json_path, "w", encoding="utf-8") as jf, \
+         atomic_open(csv_path, "w", newline="", encoding="utf-8") as cf:
+        writer = csv.writer(cf)
         writer.writerow([
             "browser", "last_visit", "domain", "url",
             "title", "visit_count", "flags"
         ])
+        jf.write("[")
+        separator = "\n"
         for row in timeline:
+            jf.write(separator)
+            jf.write(json.dumps(row, ensure_ascii=False))
+            separator = ",\n"
             writer.writerow([
                 row["browser"], row["last_visit"], row["domain"],
                 row["url"], row["title"], row["visit_count"],
                 "|".join(row["flags"])
             ])
+        jf.write("\n]\n" if separator == ",\n" else "]\n")
 
     return json_path, csv_path
 
-# ENTRY POINT
-
-if __name__ == "__main__":
-    print("[*] Building browser history forensic timeline...")
-    timeline = build_timeline()
-    print(f"[+] Total records extracted: {len(timeline)}")
-    save_reports(timeline)
-    print("[✓] Reports saved to browser_reports/")
-
 
 def calculate_browser_risk(timeline):
     if not timeline:
@@ -301,19 +322,8 @@ def generate_verdict(score):
 
 def run_module():
     try:
-        full_timeline = []
-
-        # Collect Chromium
-        for browser_name, path in find_chromium_dbs().items():
-            data = parse_chromium_history(path, browser_name)
-            if data:
-                full_timeline.extend(data)
-
-        # Collect Firefox / Tor
-        for path in find_firefox_dbs():
-            data = parse_firefox_history(path)
-            if data:
-                full_timeline.extend(data)
+        # Collect Chromium + Firefox / Tor, newest first
+        full_timeline = build_timeline()
 
         if not full_timeline:
             return {
@@ -354,4 +364,14 @@ def run_module():
         }
 
     except Exception as e:
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+
+
+# ENTRY POINT
+
+if __name__ == "__main__":
+    print("[*] Building browser history forensic timeline...")
+    timeline = build_timeline()
+    print(f"[+] Total records extracted: {len(timeline)}")
+    save_reports(timeline)
+    print("[✓] Reports saved to browser_reports/")
@@ -1,16 +1,26 @@
 
 import re
 import hashlib
-import json
 import os
 from email import message_from_string
 from email.message import Message
 from datetime import datetime, timezone
 from urllib.parse import urlparse
 
+# Optional: C Aho-Corasick automaton for single-pass keyword matching
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
-REPORT_DIR = os.path.join(os.getcwd(), "reports", "email_reports")
-os.makedirs(REPORT_DIR, exist_ok=True)
+# Works both as part of the Core package and when run as a script
+try:
+    from ._report_io import dump_json_bytes, ensure_report_dir
+except ImportError:
+    from _report_io import dump_json_bytes, ensure_report_dir
+
+
+REPORT_DIR = os.path.join(os.getcwd(), "reports", "email_reports")  # created on first report
 
 SUSPICIOUS_KEYWORDS = {
     "urgent", "verify", "password", "bank", "click",
@@ -38,13 +48,34 @@ BRAND_KEYWORDS = {
     "bank", "microsoft", "apple"
 }
 
+URL_RE = re.compile(r"https?://[^\s<>\"']+")
+SHORTENER_RE = re.compile("|".join(map(re.escape, SHORTENED_DOMAINS)))
+
+# Keywords and urgency phrases are matched together in one pass over the body
+PHRASES = SUSPICIOUS_KEYWORDS | URGENCY_PHRASES
+
+PHRASE_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, PHRASES)) + r")\b",
+    re.IGNORECASE
+)
+
+
+def _build_phrase_automaton():
+    automaton = ahocorasick.Automaton()
+    for phrase in PHRASES:
+        automaton.add_word(phrase, phrase)
+    automaton.make_automaton()
+    return automaton
+
+PHRASE_AUTOMATON = _build_phrase_automaton() if ahocorasick else None
+
 
 
 def sha256_hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 def extract_urls(text: str):
-    return re.findall(r"https?://[^\s<>\"']+", text)
+    return URL_RE.findall(text)
 
 def get_domain(email_addr: str) -> str:
     try:
@@ -52,6 +83,25 @@ def get_domain(email_addr: str) -> str:
     except Exception:
         return ""
 
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+def find_phrases(lowered: str) -> list:
+    """Whole-word PHRASES hits in already-lowercased text, in order of appearance."""
+    if PHRASE_AUTOMATON is None:
+        return list(dict.fromkeys(PHRASE_RE.findall(lowered)))
+
+    hits = {}
+    for end, phrase in PHRASE_AUTOMATON.iter(lowered):
+        start = end - len(phrase) + 1
+        # Same word boundaries the \b regex enforces
+        if start > 0 and _is_word_char(lowered[start - 1]):
+            continue
+        if end + 1 < len(lowered) and _is_word_char(lowered[end + 1]):
+            continue
+        hits.setdefault(phrase)
+    return list(hits)
+
 # CORE ANALYSIS
 
 def analyze_email(raw_email: str) -> dict:
@@ -73,12 +123,14 @@ def analyze_email(raw_email: str) -> dict:
     findings = []
     score = 0
 
+    # Lowercased once; every case-insensitive rule below reuses these
+    subject_lower = subject.lower()
+    body_lower = body.lower()
+
     # 1️ Suspicious Keywords
     
-    found_keywords = [
-        kw for kw in SUSPICIOUS_KEYWORDS
-        if re.search(fr"\b{re.escape(kw)}\b", body, re.IGNORECASE)
-    ]
+    phrase_hits = find_phrases(body_lower)
+    found_keywords = [p for p in phrase_hits if p in SUSPICIOUS_KEYWORDS]
 
     if found_keywords:
         findings.append({
@@ -90,8 +142,7 @@ def analyze_email(raw_email: str) -> dict:
     
     # 2️ Urgency Language
     
-    if any(re.search(fr"\b{re.escape(p)}\b", body, re.IGNORECASE)
-           for p in URGENCY_PHRASES):
+    if any(p in URGENCY_PHRASES for p in phrase_hits):
         findings.append({
             "type": "urgency_language"
         })
@@ -106,7 +157,7 @@ def analyze_email(raw_email: str) -> dict:
     for u in urls:
         domain = urlparse(u).netloc.lower()
 
-        if any(short in domain for short in SHORTENED_DOMAINS):
+        if SHORTENER_RE.search(domain):
             suspicious_urls.append(u)
             score += 18
 
@@ -134,9 +185,6 @@ def analyze_email(raw_email: str) -> dict:
     
     # 5️ Brand Impersonation Check
    
-    subject_lower = subject.lower()
-    body_lower = body.lower()
-
     for brand in BRAND_KEYWORDS:
         if brand in subject_lower or brand in body_lower:
             if brand not in sender_domain:
@@ -176,11 +224,13 @@ def analyze_email(raw_email: str) -> dict:
 
 
 def save_email_report(report: dict) -> str:
+    ensure_report_dir(REPORT_DIR)
+
     filename = f"email_report_{report['email_hash'][:12]}.json"
     path = os.path.join(REPORT_DIR, filename)
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2)
+    with open(path, "wb") as f:
+        f.write(dump_json_bytes(report))
 
     return path
 
@@ -1,4 +1,4 @@
-from sqlalchemy import create_all, Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import datetime
@@ -22,6 +22,9 @@ class Evidence(Base):
     value = Column(String)
     verdict = Column(String)
     risk_score = Column(Integer)
-    case_id = Column(Integer, ForeignKey("cases.id"))
+    case_id = Column(Integer, ForeignKey("cases.id"), index=True)
     
-    owner_case = relationship("Case", back_populates="evidence")
\ No newline at end of file
+    owner_case = relationship("Case", back_populates="evidence")
+
+    # "All evidence of type X in case Y" is the common filter
+    __table_args__ = (Index("ix_evidence_case_type", "case_id", "type"),)
\ No newline at end of file
@@ -1,6 +1,9 @@
 import os
+import asyncio
+import shutil
 import hashlib
 import sqlite3
+import tempfile
 import json
 from datetime import datetime
 from fastapi import FastAPI, UploadFile, File, Form
@@ -25,8 +28,20 @@ app = FastAPI()
 app.mount("/reports", StaticFiles(directory="reports"), name="reports")
 # ----------------
 
+# One connection for the whole process instead of a connect/close per
+# request. The DB endpoints run on the event loop, so access is serialized;
+# check_same_thread=False only allows the handle to be created elsewhere.
+_db = None
+
+def get_db():
+    global _db
+    if _db is None:
+        _db = sqlite3.connect('forensics.db', check_same_thread=False)
+        _db.row_factory = sqlite3.Row
+    return _db
+
 def init_db():
-    conn = sqlite3.connect('forensics.db')
+    conn = get_db()
     cursor = conn.cursor()
     cursor.execute('''CREATE TABLE IF NOT EXISTS cases 
                       (id TEXT PRIMARY KEY, name TEXT, created_at TEXT)''')
@@ -34,8 +49,10 @@ def init_db():
                       (id INTEGER PRIMARY KEY AUTOINCREMENT, case_id TEXT, 
                        type TEXT, target TEXT, score INTEGER, verdict TEXT, 
                        findings TEXT, timestamp TEXT, raw_json TEXT)''')
+    # Case history and report queries filter on case_id
+    cursor.execute('''CREATE INDEX IF NOT EXISTS ix_evidence_case_id
+                      ON evidence (case_id)''')
     conn.commit()
-    conn.close()
 
 init_db()
 
@@ -48,23 +65,19 @@ app.add_middleware(
 
 @app.get("/api/get-all-cases")
 async def get_all_cases():
-    conn = sqlite3.connect('forensics.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     cursor.execute("SELECT * FROM cases ORDER BY created_at DESC")
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 @app.post("/api/create-case")
 async def create_case(case_name: str = Form(...)):
     case_id = f"FS-{hashlib.md5(case_name.encode()).hexdigest()[:5].upper()}"
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    conn = sqlite3.connect('forensics.db')
+    conn = get_db()
     cursor = conn.cursor()
     cursor.execute("INSERT OR IGNORE INTO cases (id, name, created_at) VALUES (?, ?, ?)", (case_id, case_name, timestamp))
     conn.commit()
-    conn.close()
     return {"id": case_id, "name": case_name}
 
 from fastapi import Request
@@ -90,7 +103,7 @@ async def save_evidence(request: Request):
 
     timestamp = datetime.now().strftime("%H:%M:%S")
 
-    conn = sqlite3.connect('forensics.db')
+    conn = get_db()
     cursor = conn.cursor()
     cursor.execute("""
         INSERT INTO evidence 
@@ -98,29 +111,22 @@ async def save_evidence(request: Request):
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     """, (case_id, type_, target, score, verdict, findings, timestamp, raw_json))
     conn.commit()
-    conn.close()
 
     return {"status": "success"}
 
 @app.get("/api/get-case-history/{case_id}")
 async def get_history(case_id: str):
-    conn = sqlite3.connect('forensics.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     cursor.execute("SELECT * FROM evidence WHERE case_id = ? ORDER BY id DESC", (case_id,))
     rows = cursor.fetchall()
-    conn.close()
     return [dict(row) for row in rows]
 
 @app.get("/api/generate-report/{case_id}")
 async def generate_report(case_id: str):
-    conn = sqlite3.connect('forensics.db')
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     
     case = cursor.execute("SELECT * FROM cases WHERE id=?", (case_id,)).fetchone()
     evidence = cursor.execute("SELECT * FROM evidence WHERE case_id=? ORDER BY timestamp DESC", (case_id,)).fetchall()
-    conn.close()
 
     if not case:
         return {"error": "Case not found"}
@@ -168,15 +174,40 @@ async def analyze_url(url: str = Form(...)):
 async def analyze_email(content: str = Form(...)):
     return email_analyzer.run_module(content)
 
-@app.post("/api/analyze-file")
-async def analyze_file(file: UploadFile = File(...)):
-    file_path = f"temp_{file.filename}"
-    with open(file_path, "wb") as f: f.write(await file.read())
+def _analyze_upload(upload: UploadFile):
+    # Unique temp path per request, so concurrent uploads with the same name
+    # cannot collide; the original name is kept as the suffix so the
+    # analyzer still sees the real extension
+    suffix = f"_{os.path.basename(upload.filename or 'upload')}"
+    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix, buffering=1 << 20)
+    file_path = tmp.name
     try:
+        # Copy the spooled upload in 1 MiB chunks instead of one full read()
+        with tmp:
+            shutil.copyfileobj(upload.file, tmp, length=1 << 20)
         return File_Analyzer.run_module(file_path)
     finally:
-        if os.path.exists(file_path): os.remove(file_path)
+        # Also runs when the copy fails (disk full, broken upload stream)
+        os.unlink(file_path)
+
+# URL and email analysis are sub-millisecond and run inline on the event
+# loop; file and browser scans do blocking disk I/O and heavy CPU work, so
+# they go to a worker thread to keep the loop free for other requests.
+
+@app.post("/api/analyze-file")
+async def analyze_file(file: UploadFile = File(...)):
+    return await asyncio.to_thread(_analyze_upload, file)
 
 @app.get("/api/browser-scan")
 async def browser_scan():
-    return browser_history_analyzer.run_module()
\ No newline at end of file
+    return await asyncio.to_thread(browser_history_analyzer.run_module)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard])
+    # and falls back to asyncio/h11 otherwise, e.g. uvloop on Windows.
+    # Workers need the import string rather than the app object.
+    uvicorn.run("main:app", host="0.0.0.0", port=8000,
+                loop="auto", http="auto", workers=os.cpu_count())